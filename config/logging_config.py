@@ -0,0 +1,22 @@
+import logging
+import logging.handlers
+import queue
+
+LOGGER_NAME = "agentx"
+
+def setup_logging(level: int = logging.INFO) -> logging.handlers.QueueListener:
+    """Route application log records through a queue flushed by a background thread"""
+    log_queue = queue.Queue(-1)
+    
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    
+    # Request handlers only enqueue records; the listener thread does the actual I/O
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(level)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.propagate = False
+    
+    listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    return listener
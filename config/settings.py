@@ -20,22 +20,42 @@ class Settings(BaseSettings):
     fastapi_host: str = "0.0.0.0"
     fastapi_port: int = 8000
     fastapi_debug: bool = True
+    # Chroma's PersistentClient is not process-safe: with more than one worker, documents
+    # uploaded through one worker are not visible to the others until they restart.
+    # Keep a single worker until Chroma runs as a server.
+    fastapi_workers: int = 1
     
     # Application Configuration
     chunk_size: int = 300
     chunk_overlap: int = 50
     max_tokens: int = 500
     temperature: float = 0.4
+    embedding_batch_size: int = 64
+    embedding_concurrency: int = 8
+    
+    # Cache Configuration
+    embedding_cache_size: int = 2048
+    embedding_cache_ttl: int = 3600
+    embedding_cache_path: Optional[str] = None
+    embedding_cache_disk_max_files: int = 10000
+    answer_cache_size: int = 512
+    answer_cache_ttl: int = 3600
+    # Minimum cosine between question embeddings to reuse a cached answer. This depends on
+    # embedding_model: ada-002 scores different questions on one topic (annual vs sick
+    # leave) well above 0.9, so keep this strict and re-tune it when the model changes.
+    answer_cache_threshold: float = 0.98
     
     # Audio Configuration
     audio_sample_rate: int = 16000
     audio_channels: int = 1
     audio_format: str = "wav"
+    audio_cache_max_files: int = 500
     
     model_config = {
         "env_file": ".env",
         "case_sensitive": False,
-        "extra": "ignore"
+        "extra": "ignore",
+        "frozen": True
     }
 
 @lru_cache()
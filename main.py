@@ -1,11 +1,17 @@
 from fastapi import FastAPI, HTTPException, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, FileResponse
+from fastapi.responses import StreamingResponse, FileResponse, ORJSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 import os
 import io
 import asyncio
+import hashlib
+import uuid
+import json
+import base64
+import codecs
+import logging
 from typing import Optional
 import uvicorn
 
@@ -13,12 +19,16 @@ from services.rag_service import RAGService
 from services.tts_service import TTSService
 from services.stt_service import STTService
 from config.settings import get_settings
+from config.logging_config import LOGGER_NAME, setup_logging
+
+logger = logging.getLogger(LOGGER_NAME)
 
 # Initialize FastAPI app
 app = FastAPI(
     title="AgentX AI RAG System",
     description="RAG system with voice capabilities for HR data",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -28,13 +38,29 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # /query-stream returns the answer and sources in these headers
+    expose_headers=["X-Answer-B64", "X-Sources-B64"],
 )
 
 # Initialize services
 settings = get_settings()
-rag_service = RAGService()
-tts_service = TTSService()
-stt_service = STTService()
+rag_service = RAGService(settings)
+tts_service = TTSService(settings)
+stt_service = STTService(settings)
+
+# TTS audio cache, content-addressed by the synthesized text
+AUDIO_DIR = "frontend/audio"
+AUDIO_EVICTION_INTERVAL = 300
+AUDIO_WRITE_BUFFER_SIZE = 512 * 1024
+
+# Uploaded documents are read and decoded in pieces of this size
+UPLOAD_READ_CHUNK_SIZE = 1 << 20
+audio_eviction_task = None
+log_listener = None
+
+# Pre-synthesized audio for the canned greeting replies, kept in memory
+canned_audio = {}
+canned_languages = {}
 
 # Mount static files
 app.mount("/static", StaticFiles(directory="frontend"), name="static")
@@ -52,17 +78,107 @@ class QueryResponse(BaseModel):
 @app.on_event("startup")
 async def startup_event():
     """Initialize the RAG system on startup"""
+    global audio_eviction_task, log_listener
+    log_listener = setup_logging()
+    os.makedirs(AUDIO_DIR, exist_ok=True)
     await rag_service.initialize()
-    print("RAG system initialized successfully")
+    await prepare_canned_audio()
+    audio_eviction_task = asyncio.create_task(audio_cache_eviction_loop())
+    logger.info("RAG system initialized successfully")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release long-lived resources on shutdown"""
+    if audio_eviction_task:
+        audio_eviction_task.cancel()
+    await rag_service.close()
+    await tts_service.close()
+    if log_listener:
+        log_listener.stop()
+
+async def prepare_canned_audio():
+    """Synthesize the canned greeting replies once so greetings never wait on TTS"""
+    languages = list(rag_service.friendly_responses)
+    texts = [rag_service.friendly_responses[language] for language in languages]
+    results = await asyncio.gather(
+        *[tts_service.text_to_speech(text) for text in texts],
+        return_exceptions=True
+    )
+    
+    for language, text, audio_data in zip(languages, texts, results):
+        if isinstance(audio_data, Exception):
+            logger.error("TTS Error preparing canned audio: %s", audio_data)
+            continue
+        canned_audio[language] = audio_data
+        canned_languages[text] = language
+
+async def get_or_create_audio(text: str) -> str:
+    """Return the URL of the TTS audio for text, synthesizing it only on a cache miss"""
+    # Canned replies are served straight from memory
+    if text in canned_languages:
+        return f"/canned-audio/{canned_languages[text]}"
+    
+    # Stable across processes (unlike hash()) and wide enough that answers never collide
+    key = hashlib.blake2b(text.encode("utf-8"), digest_size=12).hexdigest()
+    audio_filename = f"response_{key}.mp3"
+    audio_path = os.path.join(AUDIO_DIR, audio_filename)
+    
+    try:
+        # Mark as recently used so eviction drops older files first; this doubles as the exists check
+        os.utime(audio_path)
+    except FileNotFoundError:
+        audio_data = await tts_service.text_to_speech(text)
+        
+        # Write to a temporary file and rename so readers never see a partial mp3
+        temp_path = f"{audio_path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, "xb", buffering=AUDIO_WRITE_BUFFER_SIZE) as f:
+            f.write(audio_data)
+        os.replace(temp_path, audio_path)
+    
+    return f"/static/audio/{audio_filename}"
+
+def evict_audio_cache(max_files: int):
+    """Delete the least recently used audio files beyond max_files"""
+    entries = [entry for entry in os.scandir(AUDIO_DIR) if entry.is_file() and entry.name.endswith(".mp3")]
+    if len(entries) <= max_files:
+        return
+    
+    entries.sort(key=lambda entry: entry.stat().st_mtime)
+    for entry in entries[:len(entries) - max_files]:
+        try:
+            os.unlink(entry.path)
+        except FileNotFoundError:
+            pass
+
+async def audio_cache_eviction_loop():
+    """Periodically cap the size of the audio cache directory"""
+    while True:
+        await asyncio.sleep(AUDIO_EVICTION_INTERVAL)
+        try:
+            await asyncio.to_thread(evict_audio_cache, settings.audio_cache_max_files)
+        except Exception:
+            logger.exception("Audio cache eviction error")
 
 @app.get("/")
 async def read_root():
     """Serve the main HTML page"""
     return FileResponse('frontend/index.html')
 
+@app.get("/canned-audio/{language}")
+async def get_canned_audio(language: str):
+    """Serve pre-synthesized audio for a canned greeting reply"""
+    audio_data = canned_audio.get(language)
+    if audio_data is None:
+        raise HTTPException(status_code=404, detail="Audio not found")
+    return Response(content=audio_data, media_type="audio/mpeg")
+
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "embedding_cache": rag_service.embedding_cache.stats(),
+        "answer_cache": rag_service.answer_cache.stats()
+    }
 
 @app.post("/query", response_model=QueryResponse)
 async def query_documents(request: QueryRequest):
@@ -78,20 +194,9 @@ async def query_documents(request: QueryRequest):
         
         # Always enable TTS for bot responses
         try:
-            audio_data = await tts_service.text_to_speech(result["answer"])
-            # Save audio file temporarily
-            audio_filename = f"response_{hash(result['answer']) % 10000}.mp3"
-            audio_path = f"frontend/audio/{audio_filename}"
-            
-            # Create audio directory if it doesn't exist
-            os.makedirs("frontend/audio", exist_ok=True)
-            
-            with open(audio_path, "wb") as f:
-                f.write(audio_data)
-            
-            response.audio_url = f"/static/audio/{audio_filename}"
-        except Exception as e:
-            print(f"TTS Error: {e}")
+            response.audio_url = await get_or_create_audio(result["answer"])
+        except Exception:
+            logger.exception("TTS Error")
             # Continue without audio if TTS fails
         
         return response
@@ -99,6 +204,44 @@ async def query_documents(request: QueryRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+async def relay_audio_stream(audio_stream):
+    """Yield upstream audio chunks, closing the upstream response even if the client disconnects"""
+    try:
+        async for chunk in audio_stream.aiter_bytes():
+            yield chunk
+    finally:
+        await audio_stream.aclose()
+
+@app.post("/query-stream")
+async def query_documents_stream(request: QueryRequest):
+    """Query the RAG system and stream the spoken answer as it is synthesized"""
+    try:
+        # Get answer from RAG system
+        result = await rag_service.query(request.question)
+        
+        # Send the answer and sources alongside the audio to avoid a second round trip
+        headers = {
+            "X-Answer-B64": base64.b64encode(result["answer"].encode("utf-8")).decode("ascii"),
+            "X-Sources-B64": base64.b64encode(json.dumps(result["sources"]).encode("utf-8")).decode("ascii")
+        }
+        
+        # Canned replies are served straight from memory
+        if result["answer"] in canned_languages:
+            audio_data = canned_audio[canned_languages[result["answer"]]]
+            return Response(content=audio_data, media_type="audio/mpeg", headers=headers)
+        
+        # Start the upstream TTS stream before responding so errors still map to a 500
+        audio_stream = await tts_service.open_speech_stream(result["answer"])
+        
+        return StreamingResponse(
+            relay_audio_stream(audio_stream),
+            media_type="audio/mpeg",
+            headers=headers
+        )
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/voice-query")
 async def query_voice(audio_file: UploadFile = File(...)):
     """Query the RAG system with voice input - with TTS response"""
@@ -113,18 +256,9 @@ async def query_voice(audio_file: UploadFile = File(...)):
         # Generate TTS for voice response
         audio_response = None
         try:
-            audio_data = await tts_service.text_to_speech(result["answer"])
-            audio_filename = f"voice_response_{hash(result['answer']) % 10000}.mp3"
-            audio_path = f"frontend/audio/{audio_filename}"
-            
-            os.makedirs("frontend/audio", exist_ok=True)
-            
-            with open(audio_path, "wb") as f:
-                f.write(audio_data)
-            
-            audio_response = f"/static/audio/{audio_filename}"
-        except Exception as e:
-            print(f"TTS Error in voice query: {e}")
+            audio_response = await get_or_create_audio(result["answer"])
+        except Exception:
+            logger.exception("TTS Error in voice query")
         
         return {
             "question": question,
@@ -136,12 +270,21 @@ async def query_voice(audio_file: UploadFile = File(...)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+async def iter_upload_text(file: UploadFile):
+    """Read an uploaded file in chunks and decode it incrementally as UTF-8"""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    while True:
+        data = await file.read(UPLOAD_READ_CHUNK_SIZE)
+        if not data:
+            break
+        yield decoder.decode(data)
+    yield decoder.decode(b"", final=True)
+
 @app.post("/upload-document")
 async def upload_document(file: UploadFile = File(...)):
     """Upload and process a new document"""
     try:
-        content = await file.read()
-        result = await rag_service.add_document(content.decode('utf-8'), file.filename)
+        result = await rag_service.add_document_stream(iter_upload_text(file), file.filename)
         return {"message": "Document uploaded successfully", "document_id": result}
     
     except Exception as e:
@@ -0,0 +1,222 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+import numpy as np
+from config.logging_config import LOGGER_NAME
+
+logger = logging.getLogger(LOGGER_NAME)
+
+class EmbeddingCache:
+    # The on-disk layer is pruned back to disk_max_files once every this many writes
+    disk_prune_interval = 100
+
+    def __init__(self, maxsize: int = 2048, ttl: int = 3600, persist_path: Optional[str] = None, disk_max_files: int = 10000):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.persist_path = persist_path
+        self.disk_max_files = disk_max_files
+        self._entries = OrderedDict()
+        self._disk_writes = 0
+        self.hits = 0
+        self.misses = 0
+
+        if self.persist_path:
+            os.makedirs(self.persist_path, exist_ok=True)
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Normalize a question so trivially different spellings share one entry"""
+        return text.strip().casefold()
+
+    async def get(self, text: str) -> Optional[List[float]]:
+        """Return the cached embedding for text, or None on a miss"""
+        key = self.normalize(text)
+
+        # In-memory LRU layer
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, embedding = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return embedding
+            del self._entries[key]
+
+        # Optional on-disk layer so restarts keep the cache warm
+        if self.persist_path:
+            embedding = await asyncio.to_thread(self._read_from_disk, key)
+            if embedding is not None:
+                self._remember(key, embedding)
+                self.hits += 1
+                return embedding
+
+        self.misses += 1
+        return None
+
+    async def set(self, text: str, embedding: List[float]):
+        """Store an embedding for text"""
+        key = self.normalize(text)
+        self._remember(key, embedding)
+
+        if self.persist_path:
+            await asyncio.to_thread(self._write_to_disk, key, embedding)
+
+    def stats(self) -> dict:
+        """Return hit/miss counters for monitoring"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries)
+        }
+
+    def _remember(self, key: str, embedding: List[float]):
+        self._entries[key] = (time.monotonic() + self.ttl, embedding)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _disk_path(self, key: str) -> str:
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.persist_path, f"{digest}.json")
+
+    def _read_from_disk(self, key: str) -> Optional[List[float]]:
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                embedding = json.load(f)
+            # Mark as recently used so pruning drops older files first
+            os.utime(path)
+            return embedding
+        except FileNotFoundError:
+            return None
+        except Exception:
+            logger.exception("Error reading embedding cache")
+            return None
+
+    def _write_to_disk(self, key: str, embedding: List[float]):
+        path = self._disk_path(key)
+        # Unique per writer so concurrent misses for one key never share a temp file
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(embedding, f)
+            os.replace(temp_path, path)
+        except Exception:
+            logger.exception("Error writing embedding cache")
+            return
+
+        self._disk_writes += 1
+        if self._disk_writes % self.disk_prune_interval == 0:
+            self._prune_disk()
+
+    def _prune_disk(self):
+        """Delete the least recently used files beyond disk_max_files"""
+        try:
+            entries = [entry for entry in os.scandir(self.persist_path) if entry.is_file() and entry.name.endswith(".json")]
+            if len(entries) <= self.disk_max_files:
+                return
+
+            entries.sort(key=lambda entry: entry.stat().st_mtime)
+            for entry in entries[:len(entries) - self.disk_max_files]:
+                try:
+                    os.unlink(entry.path)
+                except FileNotFoundError:
+                    pass
+        except Exception:
+            logger.exception("Error pruning embedding cache")
+
+
+class SemanticCache:
+    def __init__(self, maxsize: int = 512, ttl: int = 3600, threshold: float = 0.98):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.threshold = threshold
+        self._embeddings = None
+        self._expires_at = np.empty(0)
+        self._entries = []
+        self._lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _unit(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _best_match(self, vector: np.ndarray):
+        """Return (index, cosine) of the closest live entry, or (None, -1.0)"""
+        if not self._entries:
+            return None, -1.0
+        scores = self._embeddings @ vector
+        scores[self._expires_at <= time.monotonic()] = -1.0
+        best = int(np.argmax(scores))
+        return best, float(scores[best])
+
+    async def lookup(self, embedding: List[float]) -> Optional[Dict[str, Any]]:
+        """Return a cached answer for a semantically identical question, or None"""
+        index, score = self._best_match(self._unit(embedding))
+        if index is not None and score >= self.threshold:
+            self.hits += 1
+            entry = self._entries[index]
+            return {
+                "answer": entry["answer"],
+                "sources": list(entry["sources"])
+            }
+
+        self.misses += 1
+        return None
+
+    async def upsert(self, embedding: List[float], result: Dict[str, Any]):
+        """Store an answer, replacing any entry for the same question"""
+        async with self._lock:
+            vector = self._unit(embedding)
+            entry = {
+                "answer": result["answer"],
+                "sources": list(result["sources"])
+            }
+            expires_at = time.monotonic() + self.ttl
+
+            index, score = self._best_match(vector)
+            if index is not None and score >= self.threshold:
+                self._embeddings[index] = vector
+                self._expires_at[index] = expires_at
+                self._entries[index] = entry
+                return
+
+            # Drop expired entries, then the oldest ones if still over capacity
+            if self._entries:
+                keep = np.flatnonzero(self._expires_at > time.monotonic())
+                if len(keep) >= self.maxsize:
+                    keep = keep[len(keep) - self.maxsize + 1:]
+                self._embeddings = self._embeddings[keep]
+                self._expires_at = self._expires_at[keep]
+                self._entries = [self._entries[i] for i in keep]
+
+            if self._embeddings is None or not self._entries:
+                self._embeddings = vector[np.newaxis, :]
+            else:
+                self._embeddings = np.vstack([self._embeddings, vector])
+            self._expires_at = np.append(self._expires_at, expires_at)
+            self._entries.append(entry)
+
+    async def clear(self):
+        """Drop every cached answer, e.g. after the document set changes"""
+        async with self._lock:
+            self._embeddings = None
+            self._expires_at = np.empty(0)
+            self._entries = []
+
+    def stats(self) -> dict:
+        """Return hit/miss counters for monitoring"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries)
+        }
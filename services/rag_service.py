@@ -1,24 +1,64 @@
 import chromadb
 from chromadb.config import Settings as ChromaSettings
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 from langchain.schema import Document
 import openai
+import httpx
 import os
 import uuid
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator
 import asyncio
-from config.settings import get_settings
+import re
+import logging
+import numpy as np
+from config.settings import Settings
+from config.logging_config import LOGGER_NAME
+from services.cache_service import EmbeddingCache, SemanticCache
+from services.text_splitter import RegexTextSplitter
+
+logger = logging.getLogger(LOGGER_NAME)
 
 class RAGService:
-    def __init__(self):
-        self.settings = get_settings()
+    def __init__(self, settings: Settings):
+        self.settings = settings
         self.client = None
         self.collection = None
-        self.embeddings = None
-        self.llm = None
+        self.openai_client = None
         self.text_splitter = None
         
+        # Precompile casual-greeting detection so each query is a single regex scan
+        casual_greetings = [
+            "how are you", "كيف حالك", "كيفك", "شلونك", "ازيك", 
+            "hello", "hi", "مرحبا", "أهلا", "السلام عليكم",
+            "good morning", "good evening", "صباح الخير", "مساء الخير"
+        ]
+        arabic_markers = ["كيف", "شلون", "ازي", "مرحبا", "أهلا", "السلام"]
+        self._casual_re = re.compile("|".join(map(re.escape, casual_greetings)), re.IGNORECASE)
+        self._ar_re = re.compile("|".join(map(re.escape, arabic_markers)), re.IGNORECASE)
+        
+        # Canned replies for casual greetings, by language
+        self.friendly_responses = {
+            "ar": "مرحباً! أنا بخير، شكراً لسؤالك. أنا مساعدك الذكي في AgentX AI وأنا هنا لمساعدتك في أي استفسارات تتعلق بالشركة أو سياسات الموارد البشرية. كيف يمكنني مساعدتك اليوم؟",
+            "en": "Hello! I'm doing great, thank you for asking! I'm your AI assistant at AgentX AI, and I'm here to help you with any questions about the company or HR policies. How can I assist you today?"
+        }
+        
+        # Cache query embeddings so repeated questions skip the embedding API
+        embedding_cache_path = None
+        if self.settings.embedding_cache_path:
+            embedding_cache_path = os.path.join(self.settings.embedding_cache_path, self.settings.embedding_model)
+        self.embedding_cache = EmbeddingCache(
+            maxsize=self.settings.embedding_cache_size,
+            ttl=self.settings.embedding_cache_ttl,
+            persist_path=embedding_cache_path,
+            disk_max_files=self.settings.embedding_cache_disk_max_files
+        )
+        
+        # Cache full answers for semantically identical questions
+        self.answer_cache = SemanticCache(
+            maxsize=self.settings.answer_cache_size,
+            ttl=self.settings.answer_cache_ttl,
+            threshold=self.settings.answer_cache_threshold
+        )
+        
     async def initialize(self):
         """Initialize ChromaDB, embeddings, and LLM"""
         try:
@@ -29,41 +69,68 @@ class RAGService:
             )
             
             # Get or create collection
-            try:
-                self.collection = self.client.get_collection(name=self.settings.chroma_collection_name)
-            except:
-                self.collection = self.client.create_collection(name=self.settings.chroma_collection_name)
-            
-            # Initialize OpenAI components
-            openai.api_key = self.settings.openai_api_key
+            self.collection = self.client.get_or_create_collection(name=self.settings.chroma_collection_name)
             
-            self.embeddings = OpenAIEmbeddings(
-                openai_api_key=self.settings.openai_api_key,
-                model=self.settings.embedding_model
-            )
-            
-            self.llm = ChatOpenAI(
-                openai_api_key=self.settings.openai_api_key,
-                model_name=self.settings.openai_model,
-                temperature=self.settings.temperature,
-                max_tokens=self.settings.max_tokens
+            # Initialize OpenAI client on a shared keepalive HTTP/2 connection pool
+            self.openai_client = openai.AsyncOpenAI(
+                api_key=self.settings.openai_api_key,
+                http_client=httpx.AsyncClient(
+                    http2=True,
+                    timeout=60,
+                    limits=httpx.Limits(max_keepalive_connections=20)
+                )
             )
             
             # Initialize text splitter
-            self.text_splitter = RecursiveCharacterTextSplitter(
+            self.text_splitter = RegexTextSplitter(
                 chunk_size=self.settings.chunk_size,
-                chunk_overlap=self.settings.chunk_overlap,
-                separators=["\n\n", "\n", ".", "!", "?", ",", " ", ""]
+                chunk_overlap=self.settings.chunk_overlap
             )
             
             # Load HR data if collection is empty
             if self.collection.count() == 0:
                 await self._load_hr_data()
+            
+            # Warm the index so the first real query doesn't pay for a cold load
+            await self._prewarm()
                 
-        except Exception as e:
-            print(f"Error initializing RAG service: {e}")
+        except Exception:
+            logger.exception("Error initializing RAG service")
             raise
     
+    async def close(self):
+        """Close the OpenAI client and its connection pool"""
+        if self.openai_client:
+            await self.openai_client.close()
+    
+    async def _prewarm(self):
+        """Prefetch ChromaDB files and run a dummy query to load the HNSW index"""
+        try:
+            await asyncio.to_thread(self._prefetch_db_files)
+            
+            # Query with a stored embedding so the vector has the right dimension
+            sample = self.collection.get(limit=1, include=["embeddings"])
+            if sample["embeddings"] is not None and len(sample["embeddings"]) > 0:
+                self.collection.query(
+                    query_embeddings=[list(sample["embeddings"][0])],
+                    n_results=1
+                )
+        except Exception:
+            logger.exception("Error prewarming RAG service")
+    
+    def _prefetch_db_files(self):
+        """Ask the kernel to read ChromaDB files into the page cache ahead of use"""
+        if not hasattr(os, "posix_fadvise"):
+            return
+        
+        for root, _, files in os.walk(self.settings.chroma_db_path):
+            for name in files:
+                fd = os.open(os.path.join(root, name), os.O_RDONLY)
+                try:
+                    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+                finally:
+                    os.close(fd)
+    
     async def _load_hr_data(self):
         """Load HR data from hr_data.txt into ChromaDB"""
         try:
@@ -73,71 +140,78 @@ class RAGService:
                     content = file.read()
                 
                 await self.add_document(content, "hr_data.txt")
-                print("HR data loaded successfully")
+                logger.info("HR data loaded successfully")
             else:
-                print("HR data file not found")
-        except Exception as e:
-            print(f"Error loading HR data: {e}")
+                logger.warning("HR data file not found")
+        except Exception:
+            logger.exception("Error loading HR data")
     
     async def add_document(self, content: str, filename: str) -> str:
         """Add a document to the vector database"""
         try:
             # Split text into chunks
             documents = self.text_splitter.create_documents([content])
-            
-            # Generate embeddings and add to ChromaDB
             texts = [doc.page_content for doc in documents]
-            embeddings = await asyncio.to_thread(self.embeddings.embed_documents, texts)
-            
-            # Create unique IDs for each chunk
-            ids = [f"{filename}_{i}_{uuid.uuid4()}" for i in range(len(texts))]
-            
-            # Prepare metadata
-            metadatas = [{
-                "source": filename,
-                "chunk_id": i,
-                "content_length": len(text)
-            } for i, text in enumerate(texts)]
-            
-            # Add to ChromaDB
-            self.collection.add(
-                embeddings=embeddings,
-                documents=texts,
-                metadatas=metadatas,
-                ids=ids
-            )
             
-            return f"Added {len(texts)} chunks from {filename}"
+            return await self._add_chunks(texts, filename)
             
-        except Exception as e:
-            print(f"Error adding document: {e}")
+        except Exception:
+            logger.exception("Error adding document")
             raise
     
+    async def add_document_stream(self, text_stream: AsyncIterator[str], filename: str) -> str:
+        """Add a document to the vector database from incrementally decoded text"""
+        try:
+            texts = await self.text_splitter.split_text_stream(text_stream)
+            
+            return await self._add_chunks(texts, filename)
+            
+        except Exception:
+            logger.exception("Error adding document")
+            raise
+    
+    async def _add_chunks(self, texts: List[str], filename: str) -> str:
+        """Embed text chunks and add them to ChromaDB"""
+        # Generate embeddings and add to ChromaDB
+        embeddings = await self._embed_documents(texts)
+        
+        # Create unique IDs for each chunk
+        ids = [f"{filename}_{i}_{uuid.uuid4()}" for i in range(len(texts))]
+        
+        # Prepare metadata
+        metadatas = [{
+            "source": filename,
+            "chunk_id": i,
+            "content_length": len(text)
+        } for i, text in enumerate(texts)]
+        
+        # Add to ChromaDB
+        self.collection.add(
+            embeddings=embeddings,
+            documents=texts,
+            metadatas=metadatas,
+            ids=ids
+        )
+        
+        # Cached answers may now be stale or missing the new sources
+        await self.answer_cache.clear()
+        
+        return f"Added {len(texts)} chunks from {filename}"
+    
     async def query(self, question: str, n_results: int = 5) -> Dict[str, Any]:
         """Query the RAG system"""
         try:
             # Check if it's a casual greeting or friendly question
-            casual_greetings = [
-                "how are you", "كيف حالك", "كيفك", "شلونك", "ازيك", 
-                "hello", "hi", "مرحبا", "أهلا", "السلام عليكم",
-                "good morning", "good evening", "صباح الخير", "مساء الخير"
-            ]
-            
             question_lower = question.lower().strip()
-            is_casual = any(greeting in question_lower for greeting in casual_greetings)
+            is_casual = self._casual_re.search(question_lower) is not None
             
             if is_casual:
                 # Handle casual greetings directly with a friendly response
-                friendly_responses = {
-                    "ar": "مرحباً! أنا بخير، شكراً لسؤالك. أنا مساعدك الذكي في AgentX AI وأنا هنا لمساعدتك في أي استفسارات تتعلق بالشركة أو سياسات الموارد البشرية. كيف يمكنني مساعدتك اليوم؟",
-                    "en": "Hello! I'm doing great, thank you for asking! I'm your AI assistant at AgentX AI, and I'm here to help you with any questions about the company or HR policies. How can I assist you today?"
-                }
-                
                 # Detect language and respond accordingly
-                if any(ar_word in question_lower for ar_word in ["كيف", "شلون", "ازي", "مرحبا", "أهلا", "السلام"]):
-                    response_text = friendly_responses["ar"]
+                if self._ar_re.search(question_lower):
+                    response_text = self.friendly_responses["ar"]
                 else:
-                    response_text = friendly_responses["en"]
+                    response_text = self.friendly_responses["en"]
                 
                 return {
                     "answer": response_text,
@@ -145,9 +219,12 @@ class RAGService:
                 }
             
             # Generate embedding for the question
-            question_embedding = await asyncio.to_thread(
-                self.embeddings.embed_query, question
-            )
+            question_embedding = await self._embed_query(question)
+            
+            # Reuse the answer of a semantically identical question if we have one
+            cached_result = await self.answer_cache.lookup(question_embedding)
+            if cached_result is not None:
+                return cached_result
             
             # Search for relevant documents
             results = self.collection.query(
@@ -184,31 +261,69 @@ class RAGService:
 """
             
             # Get response from GPT-3.5-turbo
-            response = await asyncio.to_thread(
-                self.llm.invoke, prompt
+            response = await self.openai_client.chat.completions.create(
+                model=self.settings.openai_model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=self.settings.temperature,
+                max_tokens=self.settings.max_tokens
             )
+            answer = response.choices[0].message.content
             
             # Prepare sources information
-            sources = []
-            for i, metadata in enumerate(results['metadatas'][0]):
-                sources.append({
-                    "source": metadata.get('source', 'Unknown'),
-                    "chunk_id": metadata.get('chunk_id', i),
-                    "relevance_score": 1 - results['distances'][0][i]  # Convert distance to similarity
-                })
+            # Convert all distances to similarities in one vectorized step
+            scores = (1.0 - np.asarray(results['distances'][0])).tolist()
+            sources = [{
+                "source": metadata.get('source', 'Unknown'),
+                "chunk_id": metadata.get('chunk_id', i),
+                "relevance_score": score
+            } for i, (metadata, score) in enumerate(zip(results['metadatas'][0], scores))]
             
-            return {
-                "answer": response.content,
+            result = {
+                "answer": answer,
                 "sources": sources
             }
+            await self.answer_cache.upsert(question_embedding, result)
+            
+            return result
             
         except Exception as e:
-            print(f"Error querying RAG system: {e}")
+            logger.exception("Error querying RAG system")
             return {
                 "answer": f"حدث خطأ أثناء معالجة السؤال: {str(e)}",
                 "sources": []
             }
     
+    async def _embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed document chunks in fixed-size batches dispatched concurrently"""
+        batch_size = self.settings.embedding_batch_size
+        batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+        
+        # Bound in-flight requests to avoid tripping the API rate limits
+        semaphore = asyncio.Semaphore(self.settings.embedding_concurrency)
+        
+        async def embed_batch(batch: List[str]) -> List[List[float]]:
+            async with semaphore:
+                response = await self.openai_client.embeddings.create(
+                    model=self.settings.embedding_model,
+                    input=batch
+                )
+                return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+        
+        results = await asyncio.gather(*[embed_batch(batch) for batch in batches])
+        return [embedding for batch_embeddings in results for embedding in batch_embeddings]
+    
+    async def _embed_query(self, question: str) -> List[float]:
+        """Embed a question, reusing cached embeddings for repeated questions"""
+        question_embedding = await self.embedding_cache.get(question)
+        if question_embedding is None:
+            response = await self.openai_client.embeddings.create(
+                model=self.settings.embedding_model,
+                input=question
+            )
+            question_embedding = response.data[0].embedding
+            await self.embedding_cache.set(question, question_embedding)
+        return question_embedding
+    
     async def list_documents(self) -> List[Dict[str, Any]]:
         """List all documents in the collection"""
         try:
@@ -228,6 +343,6 @@ class RAGService:
             
             return list(documents.values())
             
-        except Exception as e:
-            print(f"Error listing documents: {e}")
+        except Exception:
+            logger.exception("Error listing documents")
             return []
\ No newline at end of file
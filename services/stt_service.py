@@ -1,94 +1,76 @@
 import asyncio
 import openai
 import io
-import tempfile
-import os
+import logging
 from typing import Union
-from config.settings import get_settings
+from config.settings import Settings
+from config.logging_config import LOGGER_NAME
+
+logger = logging.getLogger(LOGGER_NAME)
 
 class STTService:
-    def __init__(self):
-        self.settings = get_settings()
+    def __init__(self, settings: Settings):
+        self.settings = settings
         self.client = openai.AsyncOpenAI(api_key=self.settings.openai_api_key)
     
     async def speech_to_text(self, audio_data: Union[bytes, io.BytesIO], language: str = "ar") -> str:
         """Convert speech to text using OpenAI Whisper API"""
         try:
-            # Create a temporary file for the audio data
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-                if isinstance(audio_data, bytes):
-                    temp_file.write(audio_data)
-                else:
-                    temp_file.write(audio_data.getvalue())
-                temp_file_path = temp_file.name
+            # Send the in-memory audio straight to Whisper API
+            audio_file = self._to_audio_file(audio_data)
+            transcript = await self.client.audio.transcriptions.create(
+                model="whisper-1",
+                file=audio_file,
+                language=language,
+                response_format="text"
+            )
             
-            try:
-                # Open the temporary file and send to Whisper API
-                with open(temp_file_path, "rb") as audio_file:
-                    transcript = await self.client.audio.transcriptions.create(
-                        model="whisper-1",
-                        file=audio_file,
-                        language=language,
-                        response_format="text"
-                    )
-                
-                return transcript.strip() if isinstance(transcript, str) else transcript.text.strip()
-                
-            finally:
-                # Clean up temporary file
-                if os.path.exists(temp_file_path):
-                    os.unlink(temp_file_path)
+            return transcript.strip() if isinstance(transcript, str) else transcript.text.strip()
                     
-        except Exception as e:
-            print(f"Error in speech_to_text: {e}")
+        except Exception:
+            logger.exception("Error in speech_to_text")
             raise
     
     async def speech_to_text_with_translation(self, audio_data: Union[bytes, io.BytesIO]) -> dict:
         """Convert speech to text and translate to English if needed"""
         try:
-            # Create a temporary file for the audio data
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-                if isinstance(audio_data, bytes):
-                    temp_file.write(audio_data)
-                else:
-                    temp_file.write(audio_data.getvalue())
-                temp_file_path = temp_file.name
+            audio_file = self._to_audio_file(audio_data)
+            
+            # Get transcription
+            transcript = await self.client.audio.transcriptions.create(
+                model="whisper-1",
+                file=audio_file,
+                response_format="verbose_json"
+            )
             
-            try:
-                # Get transcription
-                with open(temp_file_path, "rb") as audio_file:
-                    transcript = await self.client.audio.transcriptions.create(
-                        model="whisper-1",
-                        file=audio_file,
-                        response_format="verbose_json"
-                    )
-                
-                # Get translation if not in English
-                translation = None
-                if transcript.language != "en":
-                    with open(temp_file_path, "rb") as audio_file:
-                        translation_result = await self.client.audio.translations.create(
-                            model="whisper-1",
-                            file=audio_file,
-                            response_format="text"
-                        )
-                    translation = translation_result.strip() if isinstance(translation_result, str) else translation_result.text.strip()
-                
-                return {
-                    "text": transcript.text,
-                    "language": transcript.language,
-                    "translation": translation
-                }
-                
-            finally:
-                # Clean up temporary file
-                if os.path.exists(temp_file_path):
-                    os.unlink(temp_file_path)
+            # Get translation if not in English
+            translation = None
+            if transcript.language != "en":
+                audio_file.seek(0)
+                translation_result = await self.client.audio.translations.create(
+                    model="whisper-1",
+                    file=audio_file,
+                    response_format="text"
+                )
+                translation = translation_result.strip() if isinstance(translation_result, str) else translation_result.text.strip()
+            
+            return {
+                "text": transcript.text,
+                "language": transcript.language,
+                "translation": translation
+            }
                     
-        except Exception as e:
-            print(f"Error in speech_to_text_with_translation: {e}")
+        except Exception:
+            logger.exception("Error in speech_to_text_with_translation")
             raise
     
+    def _to_audio_file(self, audio_data: Union[bytes, io.BytesIO]) -> io.BytesIO:
+        """Wrap audio data in a named in-memory file accepted by the OpenAI client"""
+        audio_file = io.BytesIO(audio_data if isinstance(audio_data, bytes) else audio_data.getvalue())
+        # The client infers the upload format from the file name
+        audio_file.name = "audio.wav"
+        return audio_file
+    
     async def validate_audio_format(self, audio_data: bytes) -> bool:
         """Validate if the audio data is in a supported format"""
         try:
@@ -108,6 +90,6 @@ class STTService:
             
             return False
             
-        except Exception as e:
-            print(f"Error validating audio format: {e}")
+        except Exception:
+            logger.exception("Error validating audio format")
             return False
\ No newline at end of file
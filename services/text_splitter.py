@@ -0,0 +1,104 @@
+import re
+from typing import AsyncIterator, List, Optional, Tuple
+from langchain.schema import Document
+
+class RegexTextSplitter:
+    # Cut points in order of preference: paragraph, line, sentence end, word
+    line_separators = ("\n\n", "\n")
+    sentence_ends = (". ", "! ", "? ", "؟ ")
+
+    def __init__(self, chunk_size: int, chunk_overlap: int):
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self._space_re = re.compile(r"\s+")
+
+    def split_text(self, text: str) -> List[str]:
+        """Split text into chunks of at most chunk_size characters, cutting at the best separator"""
+        chunks = []
+        self._split_from(text, 0, 0, chunks, final=True)
+        return chunks
+
+    async def split_text_stream(self, text_stream: AsyncIterator[str]) -> List[str]:
+        """Split incrementally received text, producing the same chunks as split_text"""
+        chunks = []
+        buffer = ""
+        floor = 0
+        async for text in text_stream:
+            pos, floor = self._split_from(buffer + text, 0, floor, chunks, final=False)
+            # Only text from the start of the next chunk onwards is still needed
+            buffer = (buffer + text)[pos:]
+            floor -= pos
+
+        self._split_from(buffer, 0, floor, chunks, final=True)
+        return chunks
+
+    def create_documents(self, texts: List[str], metadatas: Optional[List[dict]] = None) -> List[Document]:
+        """Split each text into Documents, copying its metadata onto every chunk"""
+        documents = []
+        for i, text in enumerate(texts):
+            metadata = metadatas[i] if metadatas else {}
+            for chunk in self.split_text(text):
+                documents.append(Document(page_content=chunk, metadata=dict(metadata)))
+        return documents
+
+    def _split_from(self, text: str, pos: int, floor: int, chunks: List[str], final: bool) -> Tuple[int, int]:
+        """Emit chunks starting at pos; return the next chunk start and the end of the last cut
+
+        Cuts are never placed at or before floor, so every chunk holds text beyond the
+        overlap it repeats. Unless final, stop once fewer than chunk_size characters
+        remain, since a later piece of text could change where the next cut goes.
+        """
+        n = len(text)
+        while pos < n:
+            end = pos + self.chunk_size
+            if end >= n:
+                if not final:
+                    break
+                self._emit(chunks, text[pos:n])
+                return n, n
+
+            cut = self._find_cut(text, max(pos, floor), end)
+            self._emit(chunks, text[pos:cut])
+            pos = self._next_start(text, pos, cut)
+            floor = cut
+        return pos, floor
+
+    def _find_cut(self, text: str, start: int, end: int) -> int:
+        # Skip whitespace left over from the previous cut (e.g. the rest of a "\n\n")
+        match = self._space_re.match(text, start)
+        if match:
+            start = match.end()
+
+        for separator in self.line_separators:
+            index = text.rfind(separator, start + 1, end)
+            if index != -1:
+                return index
+
+        index = max(text.rfind(separator, start, end) for separator in self.sentence_ends)
+        if index != -1:
+            # Keep the punctuation with its sentence
+            return index + 1
+
+        index = text.rfind(" ", start + 1, end)
+        if index != -1:
+            return index
+
+        # No separator at all: hard cut
+        return end
+
+    def _next_start(self, text: str, pos: int, cut: int) -> int:
+        """Start the next chunk at the first word within chunk_overlap of the cut"""
+        start = max(cut - self.chunk_overlap, pos + 1)
+        if start >= cut:
+            return cut
+
+        match = self._space_re.search(text, start, cut)
+        if match is None or match.end() >= cut:
+            return cut
+        return match.end()
+
+    @staticmethod
+    def _emit(chunks: List[str], chunk: str):
+        chunk = chunk.strip()
+        if chunk:
+            chunks.append(chunk)
@@ -1,17 +1,47 @@
 import asyncio
 import httpx
+import logging
 from typing import Optional
-from config.settings import get_settings
+from config.settings import Settings
+from config.logging_config import LOGGER_NAME
+
+logger = logging.getLogger(LOGGER_NAME)
 
 class TTSService:
-    def __init__(self):
-        self.settings = get_settings()
+    def __init__(self, settings: Settings):
+        self.settings = settings
         self.base_url = "https://api.elevenlabs.io/v1"
         self.headers = {
             "Accept": "audio/mpeg",
             "Content-Type": "application/json",
             "xi-api-key": self.settings.elevenlabs_api_key
         }
+        
+        # Long-lived client so TLS connections to ElevenLabs are kept alive between calls
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={"xi-api-key": self.settings.elevenlabs_api_key},
+            http2=True,
+            timeout=30,
+            limits=httpx.Limits(max_keepalive_connections=20)
+        )
+    
+    async def close(self):
+        """Close the underlying HTTP client"""
+        await self.client.aclose()
+    
+    def _speech_payload(self, text: str) -> dict:
+        """Build the ElevenLabs request body for text"""
+        return {
+            "text": text,
+            "model_id": "eleven_multilingual_v2",
+            "voice_settings": {
+                "stability": 0.35,          # يقلل الثبات ليعطي تنويع أكثر في الصوت
+                "similarity_boost": 0.7,    # يحافظ على وضوح وقرب من نبرة الصوت الأصلية
+                "style": 0.8,               # يزيد الحماس والتفاعل
+                "use_speaker_boost": True   # يضيف قوة ووضوح في النبرة
+            }
+        }
     
     async def text_to_speech(self, text: str, voice_id: Optional[str] = None) -> bytes:
         """Convert text to speech using ElevenLabs API"""
@@ -19,69 +49,73 @@ class TTSService:
             if not voice_id:
                 voice_id = "21m00Tcm4TlvDq8ikWAM"  # Default voice ID
             
-            url = f"{self.base_url}/text-to-speech/{voice_id}"
+            url = f"/text-to-speech/{voice_id}"
             
-            data = {
-                "text": text,
-                "model_id": "eleven_multilingual_v2",
-                "voice_settings": {
-                    "stability": 0.35,          # يقلل الثبات ليعطي تنويع أكثر في الصوت
-                    "similarity_boost": 0.7,    # يحافظ على وضوح وقرب من نبرة الصوت الأصلية
-                    "style": 0.8,               # يزيد الحماس والتفاعل
-                    "use_speaker_boost": True   # يضيف قوة ووضوح في النبرة
-                }
-            }
-
+            response = await self.client.post(url, json=self._speech_payload(text), headers=self.headers)
+            
+            if response.status_code == 200:
+                return response.content
+            else:
+                logger.error("ElevenLabs API error: %s - %s", response.status_code, response.text)
+                raise Exception(f"TTS API error: {response.status_code}")
+                    
+        except Exception:
+            logger.exception("Error in text_to_speech")
+            raise
+    
+    async def open_speech_stream(self, text: str, voice_id: Optional[str] = None) -> httpx.Response:
+        """Start streaming speech for text; the caller must aclose() the returned response"""
+        try:
+            if not voice_id:
+                voice_id = "21m00Tcm4TlvDq8ikWAM"  # Default voice ID
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(url, json=data, headers=self.headers)
-                
-                if response.status_code == 200:
-                    return response.content
-                else:
-                    print(f"ElevenLabs API error: {response.status_code} - {response.text}")
-                    raise Exception(f"TTS API error: {response.status_code}")
+            url = f"/text-to-speech/{voice_id}/stream"
+            
+            request = self.client.build_request("POST", url, json=self._speech_payload(text), headers=self.headers)
+            response = await self.client.send(request, stream=True)
+            
+            if response.status_code == 200:
+                return response
+            else:
+                await response.aread()
+                await response.aclose()
+                logger.error("ElevenLabs API error: %s - %s", response.status_code, response.text)
+                raise Exception(f"TTS API error: {response.status_code}")
                     
-        except Exception as e:
-            print(f"Error in text_to_speech: {e}")
+        except Exception:
+            logger.exception("Error in open_speech_stream")
             raise
     
     async def get_available_voices(self) -> list:
         """Get list of available voices from ElevenLabs"""
         try:
-            url = f"{self.base_url}/voices"
+            url = "/voices"
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, headers={
-                    "xi-api-key": self.settings.elevenlabs_api_key
-                })
-                
-                if response.status_code == 200:
-                    return response.json().get("voices", [])
-                else:
-                    print(f"Error getting voices: {response.status_code}")
-                    return []
+            response = await self.client.get(url)
+            
+            if response.status_code == 200:
+                return response.json().get("voices", [])
+            else:
+                logger.error("Error getting voices: %s", response.status_code)
+                return []
                     
-        except Exception as e:
-            print(f"Error getting voices: {e}")
+        except Exception:
+            logger.exception("Error getting voices")
             return []
     
     async def get_voice_info(self, voice_id: str) -> dict:
         """Get information about a specific voice"""
         try:
-            url = f"{self.base_url}/voices/{voice_id}"
+            url = f"/voices/{voice_id}"
+            
+            response = await self.client.get(url)
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, headers={
-                    "xi-api-key": self.settings.elevenlabs_api_key
-                })
-                
-                if response.status_code == 200:
-                    return response.json()
-                else:
-                    print(f"Error getting voice info: {response.status_code}")
-                    return {}
+            if response.status_code == 200:
+                return response.json()
+            else:
+                logger.error("Error getting voice info: %s", response.status_code)
+                return {}
                     
-        except Exception as e:
-            print(f"Error getting voice info: {e}")
+        except Exception:
+            logger.exception("Error getting voice info")
             return {}
\ No newline at end of file
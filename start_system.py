@@ -36,17 +36,51 @@ def check_env_file():
         print("Please copy .env.example to .env and add your API keys")
         return False
 
+PREPARE_DATABASE_SCRIPT = """
+import asyncio
+from config.settings import get_settings
+from services.rag_service import RAGService
+
+async def main():
+    rag_service = RAGService(get_settings())
+    await rag_service.initialize()
+    await rag_service.close()
+
+asyncio.run(main())
+"""
+
+def prepare_database():
+    """Create the collection and load HR data once, before any worker starts"""
+    print("📦 Preparing vector database...")
+    result = subprocess.run([sys.executable, "-c", PREPARE_DATABASE_SCRIPT])
+    if result.returncode != 0:
+        print("❌ Failed to prepare vector database")
+        return False
+    return True
+
 def start_backend():
     """Start the FastAPI backend server"""
     print("🚀 Starting FastAPI backend server...")
     try:
-        # Start FastAPI server
+        from config.settings import get_settings
+        
+        # Start FastAPI server. uvicorn picks uvloop + httptools automatically where
+        # uvicorn[standard] installed them (not on Windows). Each worker runs its own
+        # startup (rag_service.initialize()) and keeps its own in-memory caches.
+        # Chroma's PersistentClient is not process-safe, so documents uploaded
+        # through one worker are not seen by the others; see fastapi_workers.
+        workers = get_settings().fastapi_workers
+        
+        # Ingest once up front so workers don't each load hr_data.txt into an empty DB
+        if workers > 1 and not prepare_database():
+            return None
+        
         backend_process = subprocess.Popen([
             sys.executable, "-m", "uvicorn", 
             "main:app", 
             "--host", "0.0.0.0", 
             "--port", "8000", 
-            "--reload"
+            "--workers", str(workers)
         ])
         return backend_process
     except Exception as e:
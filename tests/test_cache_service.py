@@ -0,0 +1,137 @@
+import asyncio
+import os
+
+import numpy as np
+import pytest
+
+from services import cache_service
+from services.cache_service import EmbeddingCache, SemanticCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake_clock = FakeClock()
+    monkeypatch.setattr(cache_service, "time", fake_clock)
+    return fake_clock
+
+
+def _axis(i, dim=8):
+    vector = np.zeros(dim, dtype=np.float32)
+    vector[i] = 1.0
+    return vector
+
+
+def _near(vector, cosine):
+    # Unit vector at the given cosine from vector, rotated towards another axis
+    other = _axis((int(np.argmax(vector)) + 1) % len(vector), len(vector))
+    return (cosine * vector + np.sqrt(1 - cosine ** 2) * other).tolist()
+
+
+def _result(answer):
+    return {"answer": answer, "sources": [{"source": f"{answer}.txt"}]}
+
+
+def test_semantic_cache_hits_only_above_threshold(clock):
+    cache = SemanticCache(threshold=0.98)
+    asyncio.run(cache.upsert(_axis(0).tolist(), _result("annual leave")))
+
+    assert asyncio.run(cache.lookup(_near(_axis(0), 0.99))) == _result("annual leave")
+    assert asyncio.run(cache.lookup(_near(_axis(0), 0.95))) is None
+    assert asyncio.run(cache.lookup(_axis(3).tolist())) is None
+    assert cache.stats() == {"hits": 1, "misses": 2, "size": 1}
+
+
+def test_semantic_cache_upsert_replaces_matching_entry(clock):
+    cache = SemanticCache(threshold=0.98)
+    asyncio.run(cache.upsert(_axis(0).tolist(), _result("old")))
+    asyncio.run(cache.upsert(_near(_axis(0), 0.99), _result("new")))
+
+    assert asyncio.run(cache.lookup(_axis(0).tolist())) == _result("new")
+    assert cache.stats()["size"] == 1
+
+
+def test_semantic_cache_entries_expire(clock):
+    cache = SemanticCache(ttl=60)
+    asyncio.run(cache.upsert(_axis(0).tolist(), _result("annual leave")))
+
+    clock.now += 59
+    assert asyncio.run(cache.lookup(_axis(0).tolist())) is not None
+
+    clock.now += 2
+    assert asyncio.run(cache.lookup(_axis(0).tolist())) is None
+
+    # Expired entries are dropped on the next insert
+    asyncio.run(cache.upsert(_axis(1).tolist(), _result("sick leave")))
+    assert cache.stats()["size"] == 1
+
+
+def test_semantic_cache_trims_oldest_beyond_maxsize(clock):
+    cache = SemanticCache(maxsize=3)
+    for i in range(5):
+        asyncio.run(cache.upsert(_axis(i).tolist(), _result(f"answer {i}")))
+
+    assert cache.stats()["size"] == 3
+    assert asyncio.run(cache.lookup(_axis(0).tolist())) is None
+    assert asyncio.run(cache.lookup(_axis(1).tolist())) is None
+    assert asyncio.run(cache.lookup(_axis(4).tolist())) == _result("answer 4")
+
+
+def test_semantic_cache_clear(clock):
+    cache = SemanticCache()
+    asyncio.run(cache.upsert(_axis(0).tolist(), _result("annual leave")))
+    asyncio.run(cache.clear())
+
+    assert cache.stats()["size"] == 0
+    assert asyncio.run(cache.lookup(_axis(0).tolist())) is None
+
+    asyncio.run(cache.upsert(_axis(1).tolist(), _result("sick leave")))
+    assert asyncio.run(cache.lookup(_axis(1).tolist())) == _result("sick leave")
+
+
+def test_embedding_cache_normalizes_and_expires(clock):
+    cache = EmbeddingCache(ttl=60)
+    asyncio.run(cache.set("  How many Leave days? ", [0.1, 0.2]))
+
+    assert asyncio.run(cache.get("how many leave days?")) == [0.1, 0.2]
+
+    clock.now += 61
+    assert asyncio.run(cache.get("how many leave days?")) is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_embedding_cache_evicts_least_recently_used(clock):
+    cache = EmbeddingCache(maxsize=2)
+    asyncio.run(cache.set("a", [1.0]))
+    asyncio.run(cache.set("b", [2.0]))
+    asyncio.run(cache.get("a"))
+    asyncio.run(cache.set("c", [3.0]))
+
+    assert asyncio.run(cache.get("b")) is None
+    assert asyncio.run(cache.get("a")) == [1.0]
+    assert asyncio.run(cache.get("c")) == [3.0]
+
+
+def test_embedding_cache_disk_layer_survives_restart(clock, tmp_path):
+    asyncio.run(EmbeddingCache(persist_path=str(tmp_path)).set("annual leave", [0.5, 0.25]))
+
+    restarted = EmbeddingCache(persist_path=str(tmp_path))
+    assert asyncio.run(restarted.get("Annual leave")) == [0.5, 0.25]
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_embedding_cache_disk_layer_is_pruned(clock, tmp_path):
+    cache = EmbeddingCache(persist_path=str(tmp_path), disk_max_files=3)
+    cache.disk_prune_interval = 1
+    for i in range(5):
+        asyncio.run(cache.set(f"question {i}", [float(i)]))
+
+    assert len(os.listdir(tmp_path)) == 3
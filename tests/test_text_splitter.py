@@ -0,0 +1,126 @@
+import asyncio
+import os
+import timeit
+
+import pytest
+
+from services.text_splitter import RegexTextSplitter
+
+DOCUMENT = (
+    "The quick brown fox jumps over the lazy dog. Hello world!\n\n"
+    "Next para, with commas, and a question? Yes.\n"
+    "سياسة الإجازات: يحق للموظف الحصول على إجازة سنوية مدفوعة الأجر.\n\n\n"
+    "Averyveryverylongtokenwithoutanyseparatorsthatexceedsthechunksize end"
+)
+
+
+HR_DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "hr_data.txt")
+
+
+def _hr_data():
+    with open(HR_DATA_PATH, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+async def _stream(pieces):
+    for piece in pieces:
+        yield piece
+
+
+def _document_chunks(splitter, text):
+    # The same chunks add_document stores for text
+    return [doc.page_content for doc in splitter.create_documents([text])]
+
+
+@pytest.mark.parametrize("chunk_size,chunk_overlap", [(40, 10), (25, 0), (300, 50)])
+def test_stream_matches_whole_document_at_every_boundary(chunk_size, chunk_overlap):
+    splitter = RegexTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    expected = _document_chunks(splitter, DOCUMENT)
+
+    for boundary in range(len(DOCUMENT) + 1):
+        pieces = [DOCUMENT[:boundary], DOCUMENT[boundary:]]
+        assert asyncio.run(splitter.split_text_stream(_stream(pieces))) == expected, boundary
+
+
+def test_stream_keeps_separator_at_piece_boundary():
+    splitter = RegexTextSplitter(chunk_size=300, chunk_overlap=50)
+
+    chunks = asyncio.run(splitter.split_text_stream(_stream(["The quick brown fox ", "jumps over"])))
+    assert chunks == ["The quick brown fox jumps over"]
+
+    chunks = asyncio.run(splitter.split_text_stream(_stream(["Hello world.\n\n", "Next para"])))
+    assert chunks == ["Hello world.\n\nNext para"]
+
+
+def test_stream_matches_whole_document_in_small_pieces():
+    splitter = RegexTextSplitter(chunk_size=40, chunk_overlap=10)
+    pieces = [DOCUMENT[i:i + 3] for i in range(0, len(DOCUMENT), 3)]
+
+    assert asyncio.run(splitter.split_text_stream(_stream(pieces))) == _document_chunks(splitter, DOCUMENT)
+
+
+def test_chunks_fit_chunk_size():
+    splitter = RegexTextSplitter(chunk_size=300, chunk_overlap=50)
+
+    chunks = splitter.split_text(_hr_data())
+    assert chunks
+    assert all(len(chunk) <= 300 for chunk in chunks)
+
+
+@pytest.mark.parametrize("chunk_overlap", [0, 50])
+def test_overlap_is_bounded(chunk_overlap):
+    splitter = RegexTextSplitter(chunk_size=300, chunk_overlap=chunk_overlap)
+    text = _hr_data()
+    chunks = splitter.split_text(text)
+
+    shared = []
+    previous_start, previous_end = -1, 0
+    for chunk in chunks:
+        # Locate each chunk in the source to measure how much it repeats of the previous one
+        start = text.find(chunk, previous_start + 1)
+        assert start != -1
+        shared.append(max(previous_end - start, 0))
+        previous_start, previous_end = start, start + len(chunk)
+
+    assert all(length <= chunk_overlap for length in shared)
+    if chunk_overlap:
+        assert any(length > 0 for length in shared)
+
+
+def test_chunks_end_at_separators():
+    text = _hr_data()
+    splitter = RegexTextSplitter(chunk_size=300, chunk_overlap=50)
+
+    position = 0
+    for chunk in splitter.split_text(text):
+        assert chunk[0] not in ".!?,؟،"
+
+        # Chunks end at a paragraph, line, sentence or word boundary, never mid-word
+        position = text.find(chunk, position)
+        assert position != -1
+        end = position + len(chunk)
+        assert end == len(text) or text[end].isspace() or chunk[-1] in ".!?؟"
+
+
+def test_prefers_paragraph_breaks():
+    splitter = RegexTextSplitter(chunk_size=60, chunk_overlap=0)
+    text = "First paragraph is short.\n\nSecond one. It has two sentences and runs on a bit."
+
+    assert splitter.split_text(text)[0] == "First paragraph is short."
+
+
+def test_faster_than_recursive_character_splitter():
+    text_splitter = pytest.importorskip("langchain.text_splitter")
+    text = _hr_data() * 20
+
+    splitter = RegexTextSplitter(chunk_size=300, chunk_overlap=50)
+    recursive_splitter = text_splitter.RecursiveCharacterTextSplitter(
+        chunk_size=300,
+        chunk_overlap=50,
+        separators=["\n\n", "\n", ".", "!", "?", ",", " ", ""]
+    )
+
+    regex_time = min(timeit.repeat(lambda: splitter.split_text(text), number=1, repeat=5))
+    recursive_time = min(timeit.repeat(lambda: recursive_splitter.split_text(text), number=1, repeat=5))
+    # Margin for timer noise; in practice the regex splitter is the faster one
+    assert regex_time <= recursive_time * 1.25